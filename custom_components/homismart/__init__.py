@@ -2,19 +2,21 @@
 from __future__ import annotations
 
 import asyncio
-import json
+from datetime import datetime
+from functools import partial
 import logging
 import os
-from typing import Any
+from typing import Any, Awaitable, Iterable
 
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.const import Platform
+from homeassistant.const import CONF_USERNAME, Platform
 from homeassistant.core import HomeAssistant, ServiceCall
 from homeassistant.exceptions import ConfigEntryNotReady, ServiceValidationError
 from homeassistant.helpers import config_validation as cv
+import orjson
 import voluptuous as vol
 
-from .const import DOMAIN
+from .const import COVER_TYPES, DATA_VALIDATED_CLIENTS, DOMAIN, LIGHT_TYPES
 from .coordinator import HomismartDataUpdateCoordinator
 
 PLATFORMS: list[Platform] = [Platform.COVER, Platform.SWITCH, Platform.LIGHT, Platform.SENSOR]
@@ -22,10 +24,12 @@ PLATFORMS: list[Platform] = [Platform.COVER, Platform.SWITCH, Platform.LIGHT, Pl
 _LOGGER = logging.getLogger(__name__)
 
 # Service schemas
+_POSITION_VALIDATOR = vol.All(vol.Coerce(int), vol.Range(min=0, max=100))
+
 SERVICE_CONTROL_GROUP = vol.Schema({
     vol.Required("device_ids"): cv.ensure_list,
     vol.Required("action"): vol.In(["open", "close", "stop", "set_position", "turn_on", "turn_off"]),
-    vol.Optional("position"): vol.All(vol.Coerce(int), vol.Range(min=0, max=100)),
+    vol.Optional("position"): _POSITION_VALIDATOR,
 })
 
 SERVICE_ROOM_FILTER = vol.Schema({
@@ -33,7 +37,7 @@ SERVICE_ROOM_FILTER = vol.Schema({
 })
 
 SERVICE_SET_POSITION = vol.Schema({
-    vol.Required("position"): vol.All(vol.Coerce(int), vol.Range(min=0, max=100)),
+    vol.Required("position"): _POSITION_VALIDATOR,
     vol.Optional("room"): cv.string,
 })
 
@@ -48,6 +52,16 @@ SERVICE_ACTIVATE_SCENE = vol.Schema({
     vol.Required("scene_name"): cv.string,
 })
 
+# Bulk service name -> device action
+_SERVICE_TO_ACTION = {
+    "open_all_covers": "open",
+    "close_all_covers": "close",
+    "stop_all_covers": "stop",
+    "set_covers_position": "set_position",
+    "turn_on_all_lights": "turn_on",
+    "turn_off_all_lights": "turn_off",
+}
+
 
 async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Set up HomISmart from a config entry."""
@@ -55,14 +69,18 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     _LOGGER.info("🏠 HomISmart integration starting setup...")
     _LOGGER.debug("Entry data: %s", entry.data)
     
-    # Create the data update coordinator
-    coordinator = HomismartDataUpdateCoordinator(hass, entry)
+    # Create the data update coordinator, reusing the config flow's client if present
+    validated_clients = hass.data.get(DATA_VALIDATED_CLIENTS, {})
+    client, connect_task = validated_clients.pop(entry.data[CONF_USERNAME], (None, None))
+    coordinator = HomismartDataUpdateCoordinator(hass, entry, client, connect_task)
     
     # Test connection and fetch initial data
     try:
         await coordinator.async_config_entry_first_refresh()
     except Exception as ex:
         _LOGGER.error("Unable to connect to HomISmart: %s", ex)
+        # Close the client, including one handed over by the config flow, before retrying
+        await coordinator.async_shutdown()
         raise ConfigEntryNotReady from ex
 
     # Store the coordinator in hass.data
@@ -90,69 +108,45 @@ async def _register_services(hass: HomeAssistant, coordinator: HomismartDataUpda
         action = call.data["action"]
         position = call.data.get("position")
         
-        _LOGGER.info("🎮 Group control: %s for devices %s", action, device_ids)
+        _LOGGER.debug("🎮 Group control: %s for devices %s", action, device_ids)
         
-        success_count = 0
-        for device_id in device_ids:
-            try:
-                success = await _perform_device_action(coordinator, device_id, action, position)
-                if success:
-                    success_count += 1
-            except Exception as ex:
-                _LOGGER.error("Failed to control device %s: %s", device_id, ex)
+        success_count = await _gather_actions(
+            _perform_device_action(coordinator, device_id, action, position)
+            for device_id in device_ids
+        )
         
         _LOGGER.info("✅ Group control completed: %d/%d devices successful", success_count, len(device_ids))
 
     async def handle_bulk_cover_action(call: ServiceCall) -> None:
         """Handle bulk cover actions (open/close/stop all)."""
-        action = call.service  # Service name becomes the action
+        action = _SERVICE_TO_ACTION[call.service]
         room_filter = call.data.get("room")
         position = call.data.get("position")
         
-        # Get all cover devices
-        covers = [device for device in coordinator.data if device.get("type") in ["shutter", "cover", "curtain"]]
-        
-        # Apply room filter if specified
-        if room_filter:
-            covers = [device for device in covers if room_filter.lower() in device.get("label", "").lower()]
+        covers = _filter_by_room(coordinator, coordinator.covers, room_filter)
         
-        _LOGGER.info("🏠 Bulk %s: %d covers%s", action, len(covers), f" in {room_filter}" if room_filter else "")
+        _LOGGER.debug("🏠 Bulk %s: %d covers in %s", action, len(covers), room_filter or "all rooms")
         
-        success_count = 0
-        for device in covers:
-            try:
-                device_id = device.get("id")
-                success = await _perform_device_action(coordinator, device_id, action.replace("_all_covers", "").replace("covers_", ""), position)
-                if success:
-                    success_count += 1
-            except Exception as ex:
-                _LOGGER.error("Failed to control cover %s: %s", device.get("label"), ex)
+        success_count = await _gather_actions(
+            _perform_device_action(coordinator, device.get("id"), action, position)
+            for device in covers
+        )
         
         _LOGGER.info("✅ Bulk cover action completed: %d/%d covers successful", success_count, len(covers))
 
     async def handle_bulk_light_action(call: ServiceCall) -> None:
         """Handle bulk light actions (turn on/off all)."""
-        action = "turn_on" if "on" in call.service else "turn_off"
+        action = _SERVICE_TO_ACTION[call.service]
         room_filter = call.data.get("room")
         
-        # Get all light devices
-        lights = [device for device in coordinator.data if device.get("type") in ["light", "dimmer", "switch"]]
+        lights = _filter_by_room(coordinator, coordinator.lights, room_filter)
         
-        # Apply room filter if specified
-        if room_filter:
-            lights = [device for device in lights if room_filter.lower() in device.get("label", "").lower()]
+        _LOGGER.debug("💡 Bulk %s: %d lights in %s", action, len(lights), room_filter or "all rooms")
         
-        _LOGGER.info("💡 Bulk %s: %d lights%s", action, len(lights), f" in {room_filter}" if room_filter else "")
-        
-        success_count = 0
-        for device in lights:
-            try:
-                device_id = device.get("id")
-                success = await _perform_device_action(coordinator, device_id, action)
-                if success:
-                    success_count += 1
-            except Exception as ex:
-                _LOGGER.error("Failed to control light %s: %s", device.get("label"), ex)
+        success_count = await _gather_actions(
+            _perform_device_action(coordinator, device.get("id"), action)
+            for device in lights
+        )
         
         _LOGGER.info("✅ Bulk light action completed: %d/%d lights successful", success_count, len(lights))
 
@@ -169,7 +163,7 @@ async def _register_services(hass: HomeAssistant, coordinator: HomismartDataUpda
         
         # Save scene to file
         scenes_file = hass.config.path(f"custom_components/{DOMAIN}/scenes.json")
-        await _save_scene(scenes_file, scene_name, scene_data)
+        await _save_scene(coordinator, scenes_file, scene_name, scene_data)
         
         _LOGGER.info("🎬 Scene '%s' created with %d devices", scene_name, len(scene_data.get("devices", [])))
 
@@ -179,7 +173,7 @@ async def _register_services(hass: HomeAssistant, coordinator: HomismartDataUpda
         
         # Load scene from file
         scenes_file = hass.config.path(f"custom_components/{DOMAIN}/scenes.json")
-        scene_data = await _load_scene(scenes_file, scene_name)
+        scene_data = await _load_scene(coordinator, scenes_file, scene_name)
         
         if not scene_data:
             raise ServiceValidationError(f"Scene '{scene_name}' not found")
@@ -189,20 +183,55 @@ async def _register_services(hass: HomeAssistant, coordinator: HomismartDataUpda
         
         _LOGGER.info("🎬 Scene '%s' activated: %d/%d devices successful", scene_name, success_count, total_devices)
 
-    # Register all services
-    hass.services.async_register(DOMAIN, "control_group", handle_control_group, schema=SERVICE_CONTROL_GROUP)
-    hass.services.async_register(DOMAIN, "open_all_covers", handle_bulk_cover_action, schema=SERVICE_ROOM_FILTER)
-    hass.services.async_register(DOMAIN, "close_all_covers", handle_bulk_cover_action, schema=SERVICE_ROOM_FILTER)
-    hass.services.async_register(DOMAIN, "stop_all_covers", handle_bulk_cover_action, schema=SERVICE_ROOM_FILTER)
-    hass.services.async_register(DOMAIN, "set_covers_position", handle_bulk_cover_action, schema=SERVICE_SET_POSITION)
-    hass.services.async_register(DOMAIN, "turn_on_all_lights", handle_bulk_light_action, schema=SERVICE_ROOM_FILTER)
-    hass.services.async_register(DOMAIN, "turn_off_all_lights", handle_bulk_light_action, schema=SERVICE_ROOM_FILTER)
-    hass.services.async_register(DOMAIN, "create_scene", handle_create_scene, schema=SERVICE_CREATE_SCENE)
-    hass.services.async_register(DOMAIN, "activate_scene", handle_activate_scene, schema=SERVICE_ACTIVATE_SCENE)
+    # Service name, handler and schema, the single list of services this integration provides
+    services = (
+        ("control_group", handle_control_group, SERVICE_CONTROL_GROUP),
+        ("open_all_covers", handle_bulk_cover_action, SERVICE_ROOM_FILTER),
+        ("close_all_covers", handle_bulk_cover_action, SERVICE_ROOM_FILTER),
+        ("stop_all_covers", handle_bulk_cover_action, SERVICE_ROOM_FILTER),
+        ("set_covers_position", handle_bulk_cover_action, SERVICE_SET_POSITION),
+        ("turn_on_all_lights", handle_bulk_light_action, SERVICE_ROOM_FILTER),
+        ("turn_off_all_lights", handle_bulk_light_action, SERVICE_ROOM_FILTER),
+        ("create_scene", handle_create_scene, SERVICE_CREATE_SCENE),
+        ("activate_scene", handle_activate_scene, SERVICE_ACTIVATE_SCENE),
+    )
+    
+    # Register all services and remove them again when the entry unloads
+    for service, handler, schema in services:
+        hass.services.async_register(DOMAIN, service, handler, schema=schema)
+        coordinator.entry.async_on_unload(partial(hass.services.async_remove, DOMAIN, service))
     
     _LOGGER.info("🛠️ HomISmart services registered successfully")
 
 
+def _filter_by_room(
+    coordinator: HomismartDataUpdateCoordinator,
+    devices: Iterable[dict[str, Any]],
+    room_filter: str | None,
+) -> Iterable[dict[str, Any]]:
+    """Return the devices whose label contains the room filter, if any."""
+    if not room_filter:
+        return devices
+    
+    room_lower = room_filter.lower()
+    labels_lower = coordinator.labels_lower
+    return [device for device in devices if room_lower in labels_lower[device["id"]]]
+
+
+async def _gather_actions(actions: Iterable[Awaitable[bool]]) -> int:
+    """Run device actions concurrently and return how many succeeded.
+    
+    The coordinator bounds how many commands are in flight at once.
+    """
+    results = await asyncio.gather(*actions, return_exceptions=True)
+    
+    for result in results:
+        if isinstance(result, Exception):
+            _LOGGER.error("Device action failed: %s", result)
+    
+    return sum(1 for result in results if result is True)
+
+
 async def _perform_device_action(coordinator: HomismartDataUpdateCoordinator, device_id: str, action: str, position: int = None) -> bool:
     """Perform an action on a device."""
     try:
@@ -236,14 +265,10 @@ async def _create_scene_from_current_state(
     """Create a scene from current device states."""
     devices = []
     
-    for device in coordinator.data:
+    for device in _filter_by_room(coordinator, coordinator.data.values(), room_filter):
         device_type = device.get("type", "")
         device_label = device.get("label", "")
         
-        # Apply room filter
-        if room_filter and room_filter.lower() not in device_label.lower():
-            continue
-        
         device_data = {
             "id": device.get("id"),
             "label": device_label,
@@ -251,7 +276,7 @@ async def _create_scene_from_current_state(
         }
         
         # Include covers
-        if include_covers and device_type in ["shutter", "cover", "curtain"]:
+        if include_covers and device_type in COVER_TYPES:
             # Store HA position (0=closed, 100=open)
             raw_position = device.get("current_level", 0)
             ha_position = 100 - raw_position  # Convert to HA format
@@ -259,99 +284,117 @@ async def _create_scene_from_current_state(
             devices.append(device_data)
         
         # Include lights/switches
-        elif include_lights and device_type in ["light", "dimmer", "switch"]:
+        elif include_lights and device_type in LIGHT_TYPES:
             device_data["state"] = device.get("state", False)
             if device_type == "dimmer":
                 device_data["brightness"] = device.get("brightness", 0)
             devices.append(device_data)
     
-            from datetime import datetime
-        return {
-            "name": scene_name,
-            "created": datetime.now().isoformat(),
-            "devices": devices,
-        }
+    return {
+        "name": scene_name,
+        "created": datetime.now().isoformat(),
+        "devices": devices,
+    }
 
 
-async def _save_scene(scenes_file: str, scene_name: str, scene_data: dict[str, Any]) -> None:
+async def _save_scene(coordinator: HomismartDataUpdateCoordinator, scenes_file: str, scene_name: str, scene_data: dict[str, Any]) -> None:
     """Save a scene to the scenes file."""
+    # Hold the lock across load, merge and write so concurrent saves don't drop scenes
+    async with coordinator.scenes_lock:
+        coordinator.scenes_cache = await coordinator.hass.async_add_executor_job(
+            _save_scene_sync, scenes_file, scene_name, scene_data, coordinator.scenes_cache
+        )
+
+
+def _save_scene_sync(
+    scenes_file: str,
+    scene_name: str,
+    scene_data: dict[str, Any],
+    cache: tuple[int | None, dict[str, Any]] | None,
+) -> tuple[int | None, dict[str, Any]]:
+    """Save a scene to the scenes file (runs in the executor)."""
     scenes = {}
     
     # Load existing scenes
-    if os.path.exists(scenes_file):
-        try:
-            with open(scenes_file, "r") as f:
-                scenes = json.load(f)
-        except Exception as ex:
-            _LOGGER.error("Failed to load existing scenes: %s", ex)
+    try:
+        _, scenes = _read_scenes_sync(scenes_file, cache)
+    except Exception as ex:
+        _LOGGER.error("Failed to load existing scenes: %s", ex)
     
-    # Add new scene
-    scenes[scene_name] = scene_data
+    # Add new scene without mutating the cached copy
+    scenes = {**scenes, scene_name: scene_data}
     
     # Save scenes
     os.makedirs(os.path.dirname(scenes_file), exist_ok=True)
-    with open(scenes_file, "w") as f:
-        json.dump(scenes, f, indent=2)
+    with open(scenes_file, "wb") as f:
+        f.write(orjson.dumps(scenes))
+    
+    return os.stat(scenes_file).st_mtime_ns, scenes
 
 
-async def _load_scene(scenes_file: str, scene_name: str) -> dict[str, Any] | None:
+async def _load_scene(coordinator: HomismartDataUpdateCoordinator, scenes_file: str, scene_name: str) -> dict[str, Any] | None:
     """Load a scene from the scenes file."""
-    if not os.path.exists(scenes_file):
-        return None
-    
+    async with coordinator.scenes_lock:
+        try:
+            coordinator.scenes_cache = await coordinator.hass.async_add_executor_job(
+                _read_scenes_sync, scenes_file, coordinator.scenes_cache
+            )
+        except Exception as ex:
+            _LOGGER.error("Failed to load scene %s: %s", scene_name, ex)
+            return None
+        
+        return coordinator.scenes_cache[1].get(scene_name)
+
+
+def _read_scenes_sync(
+    scenes_file: str, cache: tuple[int | None, dict[str, Any]] | None
+) -> tuple[int | None, dict[str, Any]]:
+    """Read all scenes, reusing the cached copy if the file is unchanged (runs in the executor)."""
     try:
-        with open(scenes_file, "r") as f:
-            scenes = json.load(f)
-        return scenes.get(scene_name)
-    except Exception as ex:
-        _LOGGER.error("Failed to load scene %s: %s", scene_name, ex)
-        return None
+        mtime = os.stat(scenes_file).st_mtime_ns
+    except FileNotFoundError:
+        return None, {}
+    
+    if cache is not None and cache[0] == mtime:
+        return cache
+    
+    with open(scenes_file, "rb") as f:
+        return mtime, orjson.loads(f.read())
 
 
 async def _apply_scene(coordinator: HomismartDataUpdateCoordinator, scene_data: dict[str, Any]) -> int:
     """Apply a scene to devices."""
-    success_count = 0
+    return await _gather_actions(
+        _apply_scene_device(coordinator, device_config)
+        for device_config in scene_data.get("devices", [])
+    )
+
+
+async def _apply_scene_device(coordinator: HomismartDataUpdateCoordinator, device_config: dict[str, Any]) -> bool:
+    """Apply the stored scene state to a single device."""
+    device_id = device_config.get("id")
+    device_type = device_config.get("type")
     
-    for device_config in scene_data.get("devices", []):
-        device_id = device_config.get("id")
-        device_type = device_config.get("type")
-        
-        try:
-            if device_type in ["shutter", "cover", "curtain"]:
-                position = device_config.get("position", 0)
-                success = await coordinator.async_set_cover_position(device_id, position)
-                if success:
-                    success_count += 1
-            
-            elif device_type in ["light", "dimmer", "switch"]:
-                state = device_config.get("state", False)
-                if state:
-                    success = await coordinator.async_turn_on_device(device_id)
-                    if success and device_type == "dimmer":
-                        brightness = device_config.get("brightness", 100)
-                        # TODO: Implement brightness control
-                else:
-                    success = await coordinator.async_turn_off_device(device_id)
-                
-                if success:
-                    success_count += 1
+    try:
+        if device_type in COVER_TYPES:
+            position = device_config.get("position", 0)
+            return await coordinator.async_set_cover_position(device_id, position)
         
-        except Exception as ex:
-            _LOGGER.error("Failed to apply scene to device %s: %s", device_config.get("label"), ex)
+        if device_type in LIGHT_TYPES:
+            state = device_config.get("state", False)
+            if state:
+                return await coordinator.async_turn_on_device(device_id)
+            return await coordinator.async_turn_off_device(device_id)
     
-    return success_count
+    except Exception as ex:
+        _LOGGER.error("Failed to apply scene to device %s: %s", device_config.get("label"), ex)
+    
+    return False
 
 
 async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Unload a config entry."""
-    # Unregister services
-    for service in [
-        "control_group", "open_all_covers", "close_all_covers", "stop_all_covers",
-        "set_covers_position", "turn_on_all_lights", "turn_off_all_lights", 
-        "create_scene", "activate_scene"
-    ]:
-        hass.services.async_remove(DOMAIN, service)
-    
+    # Services are removed by the unload callbacks registered in _register_services
     if unload_ok := await hass.config_entries.async_unload_platforms(entry, PLATFORMS):
         coordinator: HomismartDataUpdateCoordinator = hass.data[DOMAIN][entry.entry_id]
         await coordinator.async_shutdown()
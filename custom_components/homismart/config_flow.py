@@ -10,8 +10,10 @@ from homeassistant import config_entries
 from homeassistant.const import CONF_PASSWORD, CONF_USERNAME
 from homeassistant.data_entry_flow import FlowResult
 from homeassistant.exceptions import HomeAssistantError
+from homismart_client import AuthenticationError, HomismartClient
 
-from .const import DOMAIN
+from .const import DATA_VALIDATED_CLIENTS, DOMAIN
+from .coordinator import async_wait_for_devices
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -34,8 +36,12 @@ class ConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
         """Handle the initial step."""
         errors: dict[str, str] = {}
         if user_input is not None:
+            # One entry per account, so only one client ever connects per username
+            await self.async_set_unique_id(user_input[CONF_USERNAME].lower())
+            self._abort_if_unique_id_configured()
+            
             try:
-                await self._test_credentials(
+                client, connect_task = await self._test_credentials(
                     user_input[CONF_USERNAME], user_input[CONF_PASSWORD]
                 )
             except CannotConnect:
@@ -46,33 +52,46 @@ class ConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
                 _LOGGER.exception("Unexpected exception")
                 errors["base"] = "unknown"
             else:
+                # Hand the connected client to the coordinator so setup does not reconnect
+                validated_clients = self.hass.data.setdefault(DATA_VALIDATED_CLIENTS, {})
+                previous = validated_clients.pop(user_input[CONF_USERNAME], None)
+                if previous:
+                    # Don't leave a client from an earlier flow running unowned
+                    await _async_close_client(*previous)
+                validated_clients[user_input[CONF_USERNAME]] = (client, connect_task)
                 return self.async_create_entry(title="HomISmart", data=user_input)
 
         return self.async_show_form(
             step_id="user", data_schema=STEP_USER_DATA_SCHEMA, errors=errors
         )
 
-    async def _test_credentials(self, username: str, password: str) -> None:
-        """Validate the user input allows us to connect."""
-        from homismart_client import HomismartClient
-
+    async def _test_credentials(
+        self, username: str, password: str
+    ) -> tuple[HomismartClient, asyncio.Task]:
+        """Validate the user input allows us to connect and return the connected client."""
         client = None
         connect_task = None
+        validated = False
         
         try:
             # Create client instance
             client = HomismartClient(username=username, password=password)
             
-            # Create connection task and wait for it to complete
-            connect_task = asyncio.create_task(client.connect())
-            
-            # Wait longer for connection to establish (HomISmart needs more time)
-            await asyncio.sleep(5)
+            # Create connection task and wait for login and the device list
+            connect_task = self.hass.async_create_background_task(
+                client.connect(), f"{DOMAIN} connect"
+            )
+            await async_wait_for_devices(client, connect_task)
             
             # Try to get devices to validate connection
             devices = client.session.get_all_devices()
             _LOGGER.info("Successfully connected to HomISmart with %d devices", len(devices))
-                    
+            validated = True
+            return client, connect_task
+        
+        except AuthenticationError as ex:
+            _LOGGER.error("HomISmart rejected the credentials: %s", ex)
+            raise InvalidAuth from ex
         except Exception as ex:
             _LOGGER.error("Failed to connect to HomISmart: %s", ex)
             error_str = str(ex).lower()
@@ -86,14 +105,22 @@ class ConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
                 _LOGGER.error("Full error details: %s", traceback.format_exc())
                 raise CannotConnect from ex
         finally:
-            # Clean up resources
-            if connect_task and not connect_task.done():
-                connect_task.cancel()
-            if client and hasattr(client, 'close'):
-                try:
-                    await client.close()
-                except Exception:
-                    pass  # Ignore cleanup errors
+            # Clean up resources unless the client is handed over
+            if not validated:
+                await _async_close_client(client, connect_task)
+
+
+async def _async_close_client(
+    client: HomismartClient | None, connect_task: asyncio.Task | None
+) -> None:
+    """Stop a client's reconnect loop and cancel its connect task."""
+    if client:
+        try:
+            await client.disconnect()
+        except Exception:
+            pass  # Ignore cleanup errors
+    if connect_task and not connect_task.done():
+        connect_task.cancel()
 
 
 class CannotConnect(HomeAssistantError):
@@ -6,13 +6,48 @@ DOMAIN = "homismart"
 CONF_USERNAME = "username"
 CONF_PASSWORD = "password"
 
+# hass.data key for clients connected by the config flow, keyed by username
+DATA_VALIDATED_CLIENTS = f"{DOMAIN}_validated_clients"
+
+# Dispatcher signal for a single device's entities, formatted with entry ID and device ID
+SIGNAL_DEVICE_UPDATED = f"{DOMAIN}_device_updated_{{}}_{{}}"
+
 # Data update interval (30 seconds - relying on real-time events for immediate updates)
 UPDATE_INTERVAL = 30
 
+# Seconds to collect push events before running one full refresh
+PUSH_REFRESH_COOLDOWN = 0.1
+
+# Seconds to wait for the client to log in and receive the device list
+CONNECT_TIMEOUT = 10
+
+# Maximum number of device commands in flight on the client connection
+MAX_CONCURRENT_ACTIONS = 8
+
+# Entities added per call during platform setup before yielding to the event loop
+ENTITY_ADD_BATCH_SIZE = 50
+
 # Device types
 DEVICE_TYPE_COVER = "cover"
 DEVICE_TYPE_SWITCH = "switch"
 DEVICE_TYPE_LIGHT = "light"
 
+# Raw device types handled by the bulk cover and light services
+COVER_TYPES = frozenset({"shutter", "cover", "curtain"})
+LIGHT_TYPES = frozenset({"light", "dimmer", "switch"})
+
+# Device capability flags, detected once per device
+CAP_SET_LEVEL = 1
+CAP_STOP = 2
+CAP_TURN_ON = 4
+CAP_TURN_OFF = 8
+CAP_ON_OFF = 16
+
 # Event types
-EVENT_DEVICE_UPDATED = "device_updated" 
\ No newline at end of file
+EVENT_DEVICE_UPDATED = "device_updated"
+EVENT_NEW_DEVICE_ADDED = "new_device_added"
+EVENT_DEVICE_DELETED = "device_deleted"
+EVENT_SESSION_ERROR = "session_error"
+
+# Session error type reported when the server rejects the credentials
+SESSION_ERROR_AUTH_FAILED = "authentication_failed"
@@ -3,28 +3,168 @@ from __future__ import annotations
 
 import asyncio
 import logging
+import re
+from collections import defaultdict
 from datetime import timedelta
-from typing import Any
+from operator import attrgetter
+from typing import Any, Awaitable, Callable, Iterable
 
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.const import CONF_PASSWORD, CONF_USERNAME
-from homeassistant.core import HomeAssistant
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.debounce import Debouncer
+from homeassistant.helpers.dispatcher import async_dispatcher_send
 from homeassistant.helpers.update_coordinator import DataUpdateCoordinator, UpdateFailed
+from homeassistant.util import dt as dt_util
+from homismart_client import AuthenticationError, HomismartClient, HomismartError, ReceivePrefix
 
-from .const import DOMAIN, UPDATE_INTERVAL, EVENT_DEVICE_UPDATED
+from .const import (
+    CAP_ON_OFF,
+    CAP_SET_LEVEL,
+    CAP_STOP,
+    CAP_TURN_OFF,
+    CAP_TURN_ON,
+    CONNECT_TIMEOUT,
+    MAX_CONCURRENT_ACTIONS,
+    PUSH_REFRESH_COOLDOWN,
+    COVER_TYPES,
+    DOMAIN,
+    LIGHT_TYPES,
+    UPDATE_INTERVAL,
+    EVENT_DEVICE_DELETED,
+    EVENT_DEVICE_UPDATED,
+    EVENT_NEW_DEVICE_ADDED,
+    EVENT_SESSION_ERROR,
+    SESSION_ERROR_AUTH_FAILED,
+    SIGNAL_DEVICE_UPDATED,
+)
 
 _LOGGER = logging.getLogger(__name__)
 
+# Name keywords used to classify devices
+_COVER_NAME_RE = re.compile("shutter|blind|curtain|shade")
+_LIGHT_NAME_RE = re.compile("light|lamp|bulb")
+
+# Device method -> capability flag
+_CAPABILITY_ATTRS = (
+    ("set_level", CAP_SET_LEVEL),
+    ("stop", CAP_STOP),
+    ("turn_on", CAP_TURN_ON),
+    ("turn_off", CAP_TURN_OFF),
+    ("supports_on_off", CAP_ON_OFF),
+)
+
+
+async def async_wait_for_devices(client, connect_task: asyncio.Task, timeout: float = CONNECT_TIMEOUT) -> None:
+    """Wait until the client has logged in and received its device list.
+    
+    Call this before the connect task first runs so the device list response
+    cannot be missed. Raises AuthenticationError if the credentials are rejected.
+    """
+    session = client.session
+    device_list_received = asyncio.get_running_loop().create_future()
+    dispatch_message = session.dispatch_message
+
+    def _dispatch_message(prefix: str, data: Any) -> None:
+        dispatch_message(prefix, data)
+        # The list may be empty, so wait for the response rather than for devices
+        if prefix == ReceivePrefix.DEVICE_LIST.value and not device_list_received.done():
+            device_list_received.set_result(None)
+
+    def _on_session_error(error: dict[str, Any]) -> None:
+        if error.get("type") == SESSION_ERROR_AUTH_FAILED and not device_list_received.done():
+            device_list_received.set_exception(
+                error.get("exception") or AuthenticationError("HomISmart authentication failed")
+            )
+
+    async def _wait() -> None:
+        await asyncio.wait(
+            (device_list_received, connect_task), return_when=asyncio.FIRST_COMPLETED
+        )
+        if device_list_received.done():
+            device_list_received.result()  # Raise the authentication error, if any
+            return
+        connect_task.result()  # Surface the connection error, if any
+        raise ConnectionError("HomISmart connection closed before devices were received")
+
+    session.dispatch_message = _dispatch_message
+    session.register_event_listener(EVENT_SESSION_ERROR, _on_session_error)
+    try:
+        await asyncio.wait_for(_wait(), timeout)
+    finally:
+        del session.dispatch_message
+        session.unregister_event_listener(EVENT_SESSION_ERROR, _on_session_error)
+        device_list_received.cancel()
+
+
+# Data key, device attribute and default for the state fields of a device
+_DEVICE_FIELDS = (
+    ("onLine", "onLine", True),
+    ("current_level", "current_level", 0),
+    ("target_level", "target_level", 0),
+    ("curtainState", "curtainState", None),
+    ("state", "is_on", False),
+    ("battery", "battery", None),
+    ("rssi", "rssi", None),
+    ("lastCommunication", "lastCommunication", None),
+)
+
+# Device class -> function reading its state fields
+_STATE_READERS: dict[type, Callable[[Any], dict[str, Any]]] = {}
+
+
+def _device_state(device) -> dict[str, Any]:
+    """Return the state fields of a device that change between updates."""
+    reader = _STATE_READERS.get(type(device))
+    if reader is None:
+        reader = _STATE_READERS[type(device)] = _build_state_reader(device)
+    return reader(device)
+
+
+def _build_state_reader(device) -> Callable[[Any], dict[str, Any]]:
+    """Build a reader that fetches only the fields this kind of device provides."""
+    defaults = {key: default for key, _, default in _DEVICE_FIELDS}
+    present = [(key, attr) for key, attr, _ in _DEVICE_FIELDS if hasattr(device, attr)]
+    if not present:
+        return lambda device: dict(defaults)
+    
+    keys = [key for key, _ in present]
+    fetch = attrgetter(*(attr for _, attr in present))
+    
+    def _read(device) -> dict[str, Any]:
+        values = fetch(device)
+        state = dict(defaults)
+        state.update(zip(keys, values if len(keys) > 1 else (values,)))
+        return state
+    
+    return _read
+
 
 class HomismartDataUpdateCoordinator(DataUpdateCoordinator):
     """Class to manage fetching data from the HomISmart API."""
 
-    def __init__(self, hass: HomeAssistant, entry: ConfigEntry) -> None:
-        """Initialize."""
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        entry: ConfigEntry,
+        client: HomismartClient | None = None,
+        connect_task: asyncio.Task | None = None,
+    ) -> None:
+        """Initialize, optionally reusing a client already connected by the config flow."""
         self.hass = hass
         self.entry = entry
-        self.client = None
-        self._connect_task = None
+        self.client = client
+        self._connect_task = connect_task
+        self._device_profiles: dict[tuple[str, type], tuple[str, int]] = {}
+        self._by_type: dict[str, list[dict[str, Any]]] = {}
+        self.covers: list[dict[str, Any]] = []
+        self.lights: list[dict[str, Any]] = []
+        self.labels_lower: dict[str, str] = {}
+        self.scenes_cache: tuple[int | None, dict[str, Any]] | None = None
+        # Serializes scene file reads and writes that run in the executor
+        self.scenes_lock = asyncio.Lock()
+        # Bounds the commands in flight on the client connection
+        self._write_sem = asyncio.Semaphore(MAX_CONCURRENT_ACTIONS)
         
         super().__init__(
             hass,
@@ -32,8 +172,20 @@ class HomismartDataUpdateCoordinator(DataUpdateCoordinator):
             name=DOMAIN,
             update_interval=timedelta(seconds=UPDATE_INTERVAL),
         )
+        
+        # Coalesce bursts of push-triggered refreshes into a single fetch
+        self._push_refresh_debouncer = Debouncer(
+            hass,
+            _LOGGER,
+            cooldown=PUSH_REFRESH_COOLDOWN,
+            immediate=False,
+            function=self.async_refresh,
+        )
+        
+        if self.client:
+            self._register_listeners()
 
-    async def _async_update_data(self) -> list[dict[str, Any]]:
+    async def _async_update_data(self) -> dict[str, dict[str, Any]]:
         """Update data via library."""
         try:
             if not self.client:
@@ -46,26 +198,40 @@ class HomismartDataUpdateCoordinator(DataUpdateCoordinator):
             
             devices = self.client.session.get_all_devices()
             
-            # Convert devices to a list format for easier processing
+            # Convert devices to dicts, keyed by device ID below
             device_list = []
+            now = dt_util.utcnow()
+            previous_data = self.data or {}
+            profiles: dict[tuple[str, type], tuple[str, int]] = {}
             for device in devices:
+                device_type, caps = profiles[device.name, type(device)] = self._get_device_profile(device)
+                
+                # Polls only read the client's cache, so keep last_seen unless the device is new
+                previous = previous_data.get(device.name)
+                last_seen = previous["last_seen"] if previous and previous["device"] is device else now
                 device_data = {
                     "id": device.name,  # Using name as ID for now
                     "label": device.name,
-                    "type": self._get_device_type(device),
+                    "type": device_type,
+                    "caps": caps,
                     "device": device,
-                    "onLine": getattr(device, 'onLine', True),
-                    "current_level": getattr(device, 'current_level', 0),
-                    "target_level": getattr(device, 'target_level', 0),
-                    "curtainState": getattr(device, 'curtainState', None),
-                    "state": getattr(device, 'is_on', False),
-                    "battery": getattr(device, 'battery', None),
-                    "rssi": getattr(device, 'rssi', None),
-                    "lastCommunication": getattr(device, 'lastCommunication', None),
+                    "last_seen": last_seen,
+                    **_device_state(device),
                 }
                 device_list.append(device_data)
             
-            return device_list
+            # Keep profiles of current devices only, dropping deleted ones
+            self._device_profiles = profiles
+            
+            by_type: dict[str, list[dict[str, Any]]] = defaultdict(list)
+            for device_data in device_list:
+                by_type[device_data["type"]].append(device_data)
+            self._by_type = dict(by_type)
+            self.covers = self.devices_of_types(COVER_TYPES)
+            self.lights = self.devices_of_types(LIGHT_TYPES)
+            self.labels_lower = {d["id"]: d["label"].lower() for d in device_list}
+            
+            return {d["id"]: d for d in device_list}
             
         except Exception as ex:
             _LOGGER.error("Error communicating with HomISmart API: %s", ex)
@@ -73,180 +239,274 @@ class HomismartDataUpdateCoordinator(DataUpdateCoordinator):
 
     async def _setup_client(self) -> None:
         """Set up the HomISmart client."""
-        from homismart_client import HomismartClient
-        
         username = self.entry.data[CONF_USERNAME]
         password = self.entry.data[CONF_PASSWORD]
         
         self.client = HomismartClient(username=username, password=password)
         
-        # Connect to the client
+        # Register event listeners for pushed device changes
+        self._register_listeners()
+        
+        # Connect to the client and wait until the device list has arrived
         self._connect_task = asyncio.create_task(self.client.connect())
+        try:
+            await async_wait_for_devices(self.client, self._connect_task)
+        except BaseException:
+            # Stop the client's reconnect loop so a failed setup doesn't leak it
+            await asyncio.gather(*self._client_teardown(), return_exceptions=True)
+            raise
         
-        # Wait longer for connection to establish (HomISmart needs more time)
-        await asyncio.sleep(3)
+        _LOGGER.info("HomISmart client setup completed")
+
+    def _client_teardown(self) -> list[Awaitable[Any]]:
+        """Detach the client and return the awaitables that finish closing it."""
+        teardown: list[Awaitable[Any]] = []
         
-        # Register event listener for device updates
-        self.client.session.register_event_listener(
-            EVENT_DEVICE_UPDATED, self._on_device_updated
-        )
+        if self.client:
+            self._unregister_listeners()
+            # homismart_client stops its reconnect loop with disconnect()
+            close = getattr(self.client, 'disconnect', None) or getattr(self.client, 'close', None)
+            if close:
+                teardown.append(close())
+            self.client = None
         
-        _LOGGER.info("HomISmart client setup completed")
+        if self._connect_task and not self._connect_task.done():
+            self._connect_task.cancel()
+            teardown.append(self._connect_task)
+        self._connect_task = None
+        
+        return teardown
+
+    def _push_listeners(self) -> tuple[tuple[str, Callable[[Any], None]], ...]:
+        """Return the client events the coordinator listens to and their handlers."""
+        return (
+            (EVENT_DEVICE_UPDATED, self._on_device_updated),
+            (EVENT_NEW_DEVICE_ADDED, self._on_device_list_changed),
+            (EVENT_DEVICE_DELETED, self._on_device_list_changed),
+        )
+
+    def _register_listeners(self) -> None:
+        """Subscribe to device events pushed by the client."""
+        for event, handler in self._push_listeners():
+            self.client.session.register_event_listener(event, handler)
+
+    def _unregister_listeners(self) -> None:
+        """Unsubscribe from device events pushed by the client."""
+        for event, handler in self._push_listeners():
+            self.client.session.unregister_event_listener(event, handler)
+
+    def _on_device_list_changed(self, device) -> None:
+        """Handle devices being added or removed by fetching the full device list."""
+        if self.data is None:
+            # The first refresh is still running and will pick up the full list
+            return
+        _LOGGER.debug("Device list changed: %s", getattr(device, "name", device))
+        self.hass.async_create_task(self._push_refresh_debouncer.async_call())
 
     def _on_device_updated(self, device) -> None:
         """Handle device update events."""
         _LOGGER.debug("Device updated: %s", device.name)
-        # Trigger a fresh data fetch when a device changes
-        self.hass.async_create_task(self.async_request_refresh())
+        device_data = self.data.get(device.name) if self.data else None
+        if device_data is None or device_data["device"] is not device:
+            # Unknown or replaced device, fetch the full device list
+            self._on_device_list_changed(device)
+            return
+        
+        # Patch the pushed state in place and notify only this device's entities
+        device_data.update(_device_state(device), last_seen=dt_util.utcnow())
+        self._async_notify_device(device.name)
+
+    @callback
+    def _async_notify_device(self, device_id: str) -> None:
+        """Tell the entities of one device to write their state."""
+        async_dispatcher_send(
+            self.hass, SIGNAL_DEVICE_UPDATED.format(self.entry.entry_id, device_id)
+        )
 
-    def _get_device_type(self, device) -> str:
+    def _get_device_profile(self, device) -> tuple[str, int]:
+        """Return the cached (type, capabilities) for a device, detecting them once.
+        
+        Profiles are keyed by name and class, since the client recreates a device
+        with a new class when its type changes.
+        """
+        profile = self._device_profiles.get((device.name, type(device)))
+        if profile is None:
+            caps = 0
+            for attr, flag in _CAPABILITY_ATTRS:
+                if hasattr(device, attr):
+                    caps |= flag
+            profile = (self._get_device_type(device, caps), caps)
+        return profile
+
+    def _get_device_type(self, device, caps: int) -> str:
         """Determine the device type for Home Assistant platform mapping."""
         device_name = device.name.lower()
         
         # Check for cover devices (shutters, blinds, etc.)
-        if any(keyword in device_name for keyword in ["shutter", "blind", "curtain", "shade"]):
+        if _COVER_NAME_RE.search(device_name):
             return "shutter"
         
         # Check for light devices
-        if any(keyword in device_name for keyword in ["light", "lamp", "bulb"]):
+        if _LIGHT_NAME_RE.search(device_name):
             return "light"
         
-        # Check if device has level control (could be cover or light)
-        if hasattr(device, 'set_level'):
-            if any(keyword in device_name for keyword in ["shutter", "blind", "curtain"]):
-                return "shutter"
-            else:
-                return "light"
+        # Level control without a cover keyword in the name is a dimmable light
+        if caps & CAP_SET_LEVEL:
+            return "light"
         
         # Check if device supports on/off (switch)
-        if hasattr(device, 'turn_on') or hasattr(device, 'supports_on_off'):
+        if caps & (CAP_TURN_ON | CAP_ON_OFF):
             return "switch"
         
         # Default to switch
         return "switch"
 
-    def _get_device_by_id(self, device_id: str):
-        """Get device object by ID."""
-        if not self.data:
-            return None
-        
-        for device_data in self.data:
-            if device_data.get("id") == device_id:
-                return device_data.get("device")
-        return None
+    def devices_of_types(self, device_types: Iterable[str]) -> list[dict[str, Any]]:
+        """Return the data of all devices whose type is one of the given types."""
+        return [
+            device_data
+            for device_type in device_types
+            for device_data in self._by_type.get(device_type, ())
+        ]
 
+    def _get_device_by_id(self, device_id: str) -> tuple[Any, int]:
+        """Get device object and capability flags by ID."""
+        device_data = self.data.get(device_id) if self.data else None
+        if device_data is None:
+            return None, 0
+        return device_data["device"], device_data["caps"]
 
+    @callback
+    def _async_patch_device(self, device_id: str, **changes: Any) -> None:
+        """Optimistically apply the expected result of a command and notify entities."""
+        device_data = self.data.get(device_id) if self.data else None
+        if device_data is None:
+            return
+        
+        device_data.update(changes)
+        self._async_notify_device(device_id)
 
     async def async_set_cover_position(self, device_id: str, position: int) -> bool:
         """Set cover position (0=closed, 100=open in HA format)."""
         try:
-            device = self._get_device_by_id(device_id)
+            device, caps = self._get_device_by_id(device_id)
             if not device:
                 _LOGGER.error("Device %s not found", device_id)
                 return False
             
             # Convert HA position (0=closed, 100=open) to HomISmart (0=open, 100=closed)
-            homismart_position = 100 - position
+            homismart_position = 100 - max(0, min(100, position))
             
             # HomISmart devices require position values rounded to nearest multiple of 10
-            homismart_position_rounded = round(homismart_position / 10) * 10
+            homismart_position_rounded = (homismart_position + 5) // 10 * 10
             
-            _LOGGER.info("Setting cover %s to position %d (HomISmart: %d, Rounded: %d)", 
-                        device_id, position, homismart_position, homismart_position_rounded)
+            _LOGGER.debug("Setting cover %s to position %d (HomISmart: %d, Rounded: %d)", 
+                         device_id, position, homismart_position, homismart_position_rounded)
             
-            if hasattr(device, 'set_level'):
-                await device.set_level(homismart_position_rounded)
+            if caps & CAP_SET_LEVEL:
+                async with self._write_sem:
+                    await device.set_level(homismart_position_rounded)
+                self._async_patch_device(
+                    device_id,
+                    current_level=homismart_position_rounded,
+                    target_level=homismart_position_rounded,
+                )
                 return True
             else:
                 _LOGGER.error("Device %s does not support position control", device_id)
                 return False
                 
-        except Exception as ex:
+        except (HomismartError, asyncio.TimeoutError, OSError) as ex:
             _LOGGER.error("Failed to set cover position for %s: %s", device_id, ex)
             return False
 
     async def async_stop_cover(self, device_id: str) -> bool:
         """Stop cover movement."""
         try:
-            device = self._get_device_by_id(device_id)
+            device, caps = self._get_device_by_id(device_id)
             if not device:
                 _LOGGER.error("Device %s not found", device_id)
                 return False
             
-            _LOGGER.info("Stopping cover %s", device_id)
+            _LOGGER.debug("Stopping cover %s", device_id)
             
-            if hasattr(device, 'stop'):
-                await device.stop()
+            if caps & CAP_STOP:
+                async with self._write_sem:
+                    await device.stop()
                 return True
             else:
                 _LOGGER.warning("Device %s does not support stop command", device_id)
                 return False
                 
-        except Exception as ex:
+        except (HomismartError, asyncio.TimeoutError, OSError) as ex:
             _LOGGER.error("Failed to stop cover %s: %s", device_id, ex)
             return False
 
     async def async_turn_on_device(self, device_id: str) -> bool:
         """Turn on a device (light/switch)."""
         try:
-            device = self._get_device_by_id(device_id)
+            device, caps = self._get_device_by_id(device_id)
             if not device:
                 _LOGGER.error("Device %s not found", device_id)
                 return False
             
-            _LOGGER.info("Turning on device %s", device_id)
+            _LOGGER.debug("Turning on device %s", device_id)
             
-            if hasattr(device, 'turn_on'):
-                await device.turn_on()
-            elif hasattr(device, 'set_level'):
-                await device.set_level(100)  # Full brightness/on
+            if caps & CAP_TURN_ON:
+                async with self._write_sem:
+                    await device.turn_on()
+                self._async_patch_device(device_id, state=True)
+            elif caps & CAP_SET_LEVEL:
+                async with self._write_sem:
+                    await device.set_level(100)  # Full brightness/on
+                self._async_patch_device(device_id, state=True, current_level=100)
             else:
                 _LOGGER.error("Device %s does not support turn_on", device_id)
                 return False
             
             return True
                 
-        except Exception as ex:
+        except (HomismartError, asyncio.TimeoutError, OSError) as ex:
             _LOGGER.error("Failed to turn on device %s: %s", device_id, ex)
             return False
 
     async def async_turn_off_device(self, device_id: str) -> bool:
         """Turn off a device (light/switch)."""
         try:
-            device = self._get_device_by_id(device_id)
+            device, caps = self._get_device_by_id(device_id)
             if not device:
                 _LOGGER.error("Device %s not found", device_id)
                 return False
             
-            _LOGGER.info("Turning off device %s", device_id)
+            _LOGGER.debug("Turning off device %s", device_id)
             
-            if hasattr(device, 'turn_off'):
-                await device.turn_off()
-            elif hasattr(device, 'set_level'):
-                await device.set_level(0)  # Off
+            if caps & CAP_TURN_OFF:
+                async with self._write_sem:
+                    await device.turn_off()
+                self._async_patch_device(device_id, state=False)
+            elif caps & CAP_SET_LEVEL:
+                async with self._write_sem:
+                    await device.set_level(0)  # Off
+                self._async_patch_device(device_id, state=False, current_level=0)
             else:
                 _LOGGER.error("Device %s does not support turn_off", device_id)
                 return False
             
             return True
                 
-        except Exception as ex:
+        except (HomismartError, asyncio.TimeoutError, OSError) as ex:
             _LOGGER.error("Failed to turn off device %s: %s", device_id, ex)
             return False
 
     async def async_shutdown(self) -> None:
         """Shutdown the coordinator."""
-        if self._connect_task:
-            self._connect_task.cancel()
+        self._push_refresh_debouncer.async_cancel()
+        
+        # Tear everything down concurrently so unload waits only for the slowest step
+        teardown = [super().async_shutdown(), *self._client_teardown()]
+        
+        for result in await asyncio.gather(*teardown, return_exceptions=True):
+            if isinstance(result, Exception):
+                _LOGGER.warning("Error closing HomISmart client: %s", result)
             
-        if self.client:
-            try:
-                # Try to close the client if it has a close method
-                if hasattr(self.client, 'close'):
-                    await self.client.close()
-            except Exception as ex:
-                _LOGGER.warning("Error closing HomISmart client: %s", ex)
-            finally:
-                self.client = None
-            
-        _LOGGER.info("HomISmart coordinator shutdown completed") 
\ No newline at end of file
+        _LOGGER.info("HomISmart coordinator shutdown completed")
\ No newline at end of file
@@ -12,10 +12,10 @@ from homeassistant.components.cover import (
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.core import HomeAssistant
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
-from homeassistant.helpers.update_coordinator import CoordinatorEntity
 
-from .const import DOMAIN
+from .const import CAP_SET_LEVEL, COVER_TYPES, DOMAIN
 from .coordinator import HomismartDataUpdateCoordinator
+from .entity import HomismartEntityBase, async_add_entities_batched, async_track_new_devices
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -26,25 +26,28 @@ async def async_setup_entry(
     async_add_entities: AddEntitiesCallback,
 ) -> None:
     """Set up the HomISmart cover platform."""
-    _LOGGER.info("🏠 Setting up HomISmart cover platform...")
+    _LOGGER.debug("🏠 Setting up HomISmart cover platform...")
     
     coordinator: HomismartDataUpdateCoordinator = hass.data[DOMAIN][config_entry.entry_id]
 
-    entities = []
-    if coordinator.data:
-        for device_data in coordinator.data:
-            device_type = device_data.get("type", "")
-            if device_type in ["shutter", "cover", "curtain"]:
-                device_id = device_data.get("id")
-                device_label = device_data.get("label", device_id)
-                _LOGGER.info("📋 Adding cover entity: %s (ID: %s)", device_label, device_id)
-                entities.append(HomismartCover(coordinator, device_data, config_entry.entry_id))
+    entities = [
+        HomismartCover(coordinator, device_data, config_entry.entry_id)
+        for device_data in coordinator.devices_of_types(COVER_TYPES)
+    ]
 
     _LOGGER.info("✅ Added %d cover entities", len(entities))
-    async_add_entities(entities)
-
-
-class HomismartCover(CoordinatorEntity, CoverEntity):
+    # Track before the first await so a refresh while adding can't hide a new device
+    async_track_new_devices(
+        coordinator,
+        config_entry,
+        async_add_entities,
+        lambda: coordinator.devices_of_types(COVER_TYPES),
+        lambda device_data: (HomismartCover(coordinator, device_data, config_entry.entry_id),),
+    )
+    await async_add_entities_batched(async_add_entities, entities)
+
+
+class HomismartCover(HomismartEntityBase, CoverEntity):
     """Representation of a HomISmart cover."""
 
     def __init__(
@@ -54,99 +57,43 @@ class HomismartCover(CoordinatorEntity, CoverEntity):
         entry_id: str,
     ) -> None:
         """Initialize the cover."""
-        super().__init__(coordinator)
-        self._device_data = device_data
-        self._device_id = device_data.get("id")
-        self._device = device_data.get("device")
-        self._entry_id = entry_id
-        
-        device_label = device_data.get("label", self._device_id)
-        self._attr_name = device_label
-        self._attr_unique_id = f"{entry_id}_{self._device_id}"
+        super().__init__(coordinator, device_data, entry_id, "Smart Cover")
         self._attr_device_class = CoverDeviceClass.SHUTTER
 
         # Set supported features based on device capabilities
         self._attr_supported_features = CoverEntityFeature.OPEN | CoverEntityFeature.CLOSE
         
-        if hasattr(self._device, 'set_level'):
+        if device_data.get("caps", 0) & CAP_SET_LEVEL:
             self._attr_supported_features |= CoverEntityFeature.SET_POSITION
 
-    @property
-    def device_info(self) -> dict[str, Any]:
-        """Return device information."""
-        return {
-            "identifiers": {(DOMAIN, self._device_id)},
-            "name": self._device_data.get("label", self._device_id),
-            "manufacturer": "HomISmart",
-            "model": self._device_data.get("type", "Smart Cover"),
-            "via_device": (DOMAIN, self._entry_id),
-        }
-
-    def _get_current_device_data(self) -> dict[str, Any] | None:
-        """Get current device data from coordinator."""
-        if not self.coordinator.data:
-            return None
-        
-        for device_data in self.coordinator.data:
-            if device_data.get("id") == self._device_id:
-                return device_data
-        return None
-
-    @property
-    def is_closed(self) -> bool | None:
-        """Return if the cover is closed."""
-        device_data = self._get_current_device_data()
-        if not device_data:
-            return None
-            
-        # HomISmart: 0=open, 100=closed
-        current_level = device_data.get("current_level")
-        if current_level is not None:
-            return current_level >= 95  # Consider 95%+ as closed
-        return None
-
-    @property
-    def current_cover_position(self) -> int | None:
-        """Return current position of cover (0=closed, 100=open for HA)."""
-        device_data = self._get_current_device_data()
-        if not device_data:
-            return None
-            
+        self._update_attrs()
+
+    def _update_device_attrs(self, device_data: dict[str, Any] | None) -> None:
+        """Update the cached cover state from device data."""
         # HomISmart: 0=open, 100=closed, so invert for HA (100-value)
-        current_level = device_data.get("current_level")
+        current_level = device_data.get("current_level") if device_data else None
         if current_level is not None:
-            return 100 - current_level
-        return None
-
-    @property
-    def available(self) -> bool:
-        """Return if entity is available."""
-        device_data = self._get_current_device_data()
-        if not device_data:
-            return False
-        return device_data.get("onLine", True) and self.coordinator.last_update_success
+            self._attr_is_closed = current_level >= 95  # Consider 95%+ as closed
+            self._attr_current_cover_position = 100 - current_level
+        else:
+            self._attr_is_closed = None
+            self._attr_current_cover_position = None
 
     async def async_open_cover(self, **kwargs: Any) -> None:
         """Open the cover (HomISmart: 0=open, so send 0)."""
-        try:
-            success = await self.coordinator.async_set_cover_position(self._device_id, 100)  # HA: 100=open
-            if success:
-                _LOGGER.info("Successfully opened cover %s", self._attr_name)
-            else:
-                _LOGGER.error("Failed to open cover %s", self._attr_name)
-        except Exception as ex:
-            _LOGGER.error("Failed to open cover %s: %s", self._attr_name, ex)
+        success = await self.coordinator.async_set_cover_position(self._device_id, 100)  # HA: 100=open
+        if success:
+            _LOGGER.debug("Successfully opened cover %s", self._attr_name)
+        else:
+            _LOGGER.error("Failed to open cover %s", self._attr_name)
 
     async def async_close_cover(self, **kwargs: Any) -> None:
         """Close the cover (HomISmart: 100=closed, so send 100)."""
-        try:
-            success = await self.coordinator.async_set_cover_position(self._device_id, 0)  # HA: 0=closed
-            if success:
-                _LOGGER.info("Successfully closed cover %s", self._attr_name)
-            else:
-                _LOGGER.error("Failed to close cover %s", self._attr_name)
-        except Exception as ex:
-            _LOGGER.error("Failed to close cover %s: %s", self._attr_name, ex)
+        success = await self.coordinator.async_set_cover_position(self._device_id, 0)  # HA: 0=closed
+        if success:
+            _LOGGER.debug("Successfully closed cover %s", self._attr_name)
+        else:
+            _LOGGER.error("Failed to close cover %s", self._attr_name)
 
     async def async_set_cover_position(self, **kwargs: Any) -> None:
         """Move the cover to a specific position."""
@@ -154,22 +101,16 @@ class HomismartCover(CoordinatorEntity, CoverEntity):
         if position is None:
             return
 
-        try:
-            success = await self.coordinator.async_set_cover_position(self._device_id, position)
-            if success:
-                _LOGGER.info("Successfully set cover %s position to %s%%", self._attr_name, position)
-            else:
-                _LOGGER.error("Failed to set cover %s position to %s%%", self._attr_name, position)
-        except Exception as ex:
-            _LOGGER.error("Failed to set cover %s position to %s%%: %s", self._attr_name, position, ex)
+        success = await self.coordinator.async_set_cover_position(self._device_id, position)
+        if success:
+            _LOGGER.debug("Successfully set cover %s position to %s%%", self._attr_name, position)
+        else:
+            _LOGGER.error("Failed to set cover %s position to %s%%", self._attr_name, position)
 
     async def async_stop_cover(self, **kwargs: Any) -> None:
         """Stop the cover."""
-        try:
-            success = await self.coordinator.async_stop_cover(self._device_id)
-            if success:
-                _LOGGER.info("Successfully stopped cover %s", self._attr_name)
-            else:
-                _LOGGER.error("Failed to stop cover %s", self._attr_name)
-        except Exception as ex:
-            _LOGGER.error("Failed to stop cover %s: %s", self._attr_name, ex) 
\ No newline at end of file
+        success = await self.coordinator.async_stop_cover(self._device_id)
+        if success:
+            _LOGGER.debug("Successfully stopped cover %s", self._attr_name)
+        else:
+            _LOGGER.error("Failed to stop cover %s", self._attr_name)
@@ -0,0 +1,135 @@
+"""Shared entity helpers for HomISmart integration."""
+from __future__ import annotations
+
+import asyncio
+import logging
+from typing import Any, Callable, Iterable, Sequence
+
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import callback
+from homeassistant.helpers.dispatcher import async_dispatcher_connect
+from homeassistant.helpers.entity import Entity
+from homeassistant.helpers.entity_platform import AddEntitiesCallback
+from homeassistant.helpers.update_coordinator import CoordinatorEntity
+
+from .const import DOMAIN, ENTITY_ADD_BATCH_SIZE, SIGNAL_DEVICE_UPDATED
+from .coordinator import HomismartDataUpdateCoordinator
+
+_LOGGER = logging.getLogger(__name__)
+
+
+async def async_add_entities_batched(
+    async_add_entities: AddEntitiesCallback,
+    entities: Sequence[Entity],
+) -> None:
+    """Add entities in batches, yielding to the event loop between batches."""
+    for start in range(0, len(entities), ENTITY_ADD_BATCH_SIZE):
+        if start:
+            await asyncio.sleep(0)
+        async_add_entities(entities[start:start + ENTITY_ADD_BATCH_SIZE])
+
+
+@callback
+def async_track_new_devices(
+    coordinator: HomismartDataUpdateCoordinator,
+    config_entry: ConfigEntry,
+    async_add_entities: AddEntitiesCallback,
+    get_devices: Callable[[], Iterable[dict[str, Any]]],
+    create_entities: Callable[[dict[str, Any]], Iterable[Entity]],
+) -> None:
+    """Add entities for devices that show up in coordinator data after setup.
+    
+    Call this right after building the initial entities, before any await, so the
+    devices seen here are exactly the ones those entities were built from.
+    """
+    known_ids = {device_data["id"] for device_data in get_devices()}
+
+    @callback
+    def _async_add_new_devices() -> None:
+        new_devices = [
+            device_data for device_data in get_devices() if device_data["id"] not in known_ids
+        ]
+        if not new_devices:
+            return
+        
+        known_ids.update(device_data["id"] for device_data in new_devices)
+        entities = [
+            entity for device_data in new_devices for entity in create_entities(device_data)
+        ]
+        if entities:
+            _LOGGER.info("➕ Adding %d entities for new HomISmart devices", len(entities))
+            async_add_entities(entities)
+
+    config_entry.async_on_unload(coordinator.async_add_listener(_async_add_new_devices))
+
+
+class HomismartEntityBase(CoordinatorEntity):
+    """Base class for entities backed by a HomISmart device."""
+
+    __slots__ = ("_device_id", "_entry_id")
+
+    # Whether the entity becomes unavailable while its device is offline
+    _unavailable_when_offline = True
+
+    def __init__(
+        self,
+        coordinator: HomismartDataUpdateCoordinator,
+        device_data: dict[str, Any],
+        entry_id: str,
+        default_model: str,
+    ) -> None:
+        """Initialize the identifiers and device info shared by all platforms."""
+        super().__init__(coordinator)
+        self._device_id = device_data.get("id")
+        self._entry_id = entry_id
+        
+        device_label = device_data.get("label", self._device_id)
+        self._attr_name = device_label
+        self._attr_unique_id = f"{entry_id}_{self._device_id}"
+        self._attr_device_info = {
+            "identifiers": {(DOMAIN, self._device_id)},
+            "name": device_label,
+            "manufacturer": "HomISmart",
+            "model": device_data.get("type", default_model),
+            "via_device": (DOMAIN, entry_id),
+        }
+
+    async def async_added_to_hass(self) -> None:
+        """Subscribe to updates pushed for this entity's device."""
+        await super().async_added_to_hass()
+        self.async_on_remove(
+            async_dispatcher_connect(
+                self.hass,
+                SIGNAL_DEVICE_UPDATED.format(self._entry_id, self._device_id),
+                self._handle_coordinator_update,
+            )
+        )
+
+    def _get_current_device_data(self) -> dict[str, Any] | None:
+        """Get current device data from coordinator."""
+        if not self.coordinator.data:
+            return None
+        return self.coordinator.data.get(self._device_id)
+
+    def _update_attrs(self) -> None:
+        """Update the cached availability and state attributes from coordinator data."""
+        device_data = self._get_current_device_data()
+        available = device_data is not None and self.coordinator.last_update_success
+        if available and self._unavailable_when_offline:
+            available = bool(device_data.get("onLine", True))
+        self._attr_available = available
+        self._update_device_attrs(device_data)
+
+    def _update_device_attrs(self, device_data: dict[str, Any] | None) -> None:
+        """Update the platform state attributes, device_data is None if the device is gone."""
+
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        """Handle updated data from the coordinator."""
+        self._update_attrs()
+        super()._handle_coordinator_update()
+
+    @property
+    def available(self) -> bool:
+        """Return if entity is available."""
+        return self._attr_available
@@ -12,13 +12,16 @@ from homeassistant.components.light import (
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.core import HomeAssistant
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
-from homeassistant.helpers.update_coordinator import CoordinatorEntity
 
-from .const import DOMAIN
+from .const import CAP_SET_LEVEL, DOMAIN
 from .coordinator import HomismartDataUpdateCoordinator
+from .entity import HomismartEntityBase, async_add_entities_batched, async_track_new_devices
 
 _LOGGER = logging.getLogger(__name__)
 
+# Raw device types exposed as light entities
+LIGHT_DEVICE_TYPES = frozenset({"light", "dimmer"})
+
 
 async def async_setup_entry(
     hass: HomeAssistant,
@@ -28,21 +31,24 @@ async def async_setup_entry(
     """Set up the HomISmart light platform."""
     coordinator: HomismartDataUpdateCoordinator = hass.data[DOMAIN][config_entry.entry_id]
 
-    entities = []
-    if coordinator.data:
-        for device_data in coordinator.data:
-            device_type = device_data.get("type", "")
-            if device_type in ["light", "dimmer"]:
-                device_id = device_data.get("id")
-                device_label = device_data.get("label", device_id)
-                _LOGGER.info("💡 Adding light entity: %s (ID: %s)", device_label, device_id)
-                entities.append(HomismartLight(coordinator, device_data, config_entry.entry_id))
+    entities = [
+        HomismartLight(coordinator, device_data, config_entry.entry_id)
+        for device_data in coordinator.devices_of_types(LIGHT_DEVICE_TYPES)
+    ]
 
     _LOGGER.info("✅ Added %d light entities", len(entities))
-    async_add_entities(entities)
-
-
-class HomismartLight(CoordinatorEntity, LightEntity):
+    # Track before the first await so a refresh while adding can't hide a new device
+    async_track_new_devices(
+        coordinator,
+        config_entry,
+        async_add_entities,
+        lambda: coordinator.devices_of_types(LIGHT_DEVICE_TYPES),
+        lambda device_data: (HomismartLight(coordinator, device_data, config_entry.entry_id),),
+    )
+    await async_add_entities_batched(async_add_entities, entities)
+
+
+class HomismartLight(HomismartEntityBase, LightEntity):
     """Representation of a HomISmart light."""
 
     def __init__(
@@ -52,18 +58,10 @@ class HomismartLight(CoordinatorEntity, LightEntity):
         entry_id: str,
     ) -> None:
         """Initialize the light."""
-        super().__init__(coordinator)
-        self._device_data = device_data
-        self._device_id = device_data.get("id")
-        self._device = device_data.get("device")
-        self._entry_id = entry_id
-        
-        device_label = device_data.get("label", self._device_id)
-        self._attr_name = device_label
-        self._attr_unique_id = f"{entry_id}_{self._device_id}"
+        super().__init__(coordinator, device_data, entry_id, "Smart Light")
         
         # Set supported features and color modes
-        if hasattr(self._device, 'set_level') or device_data.get("type") == "dimmer":
+        if device_data.get("caps", 0) & CAP_SET_LEVEL or device_data.get("type") == "dimmer":
             self._attr_supported_features = LightEntityFeature.TRANSITION
             self._attr_supported_color_modes = {ColorMode.BRIGHTNESS}
             self._attr_color_mode = ColorMode.BRIGHTNESS
@@ -71,93 +69,47 @@ class HomismartLight(CoordinatorEntity, LightEntity):
             self._attr_supported_color_modes = {ColorMode.ONOFF}
             self._attr_color_mode = ColorMode.ONOFF
 
-    @property
-    def device_info(self) -> dict[str, Any]:
-        """Return device information."""
-        return {
-            "identifiers": {(DOMAIN, self._device_id)},
-            "name": self._device_data.get("label", self._device_id),
-            "manufacturer": "HomISmart",
-            "model": self._device_data.get("type", "Smart Light"),
-            "via_device": (DOMAIN, self._entry_id),
-        }
-
-    def _get_current_device_data(self) -> dict[str, Any] | None:
-        """Get current device data from coordinator."""
-        if not self.coordinator.data:
-            return None
-        
-        for device_data in self.coordinator.data:
-            if device_data.get("id") == self._device_id:
-                return device_data
-        return None
-
-    @property
-    def available(self) -> bool:
-        """Return if entity is available."""
-        device_data = self._get_current_device_data()
-        if not device_data:
-            return False
-        return device_data.get("onLine", True) and self.coordinator.last_update_success
+        self._update_attrs()
 
-    @property
-    def is_on(self) -> bool:
-        """Return true if light is on."""
-        device_data = self._get_current_device_data()
+    def _update_device_attrs(self, device_data: dict[str, Any] | None) -> None:
+        """Update the cached light state from device data."""
         if not device_data:
-            return False
-            
-        # Check various state attributes
+            self._attr_is_on = False
+            self._attr_brightness = None
+            return
+        
+        # Check various state attributes, for dimmers fall back to the current level
+        current_level = device_data.get("current_level")
         state = device_data.get("state")
         if state is not None:
-            return bool(state)
-            
-        # For dimmers, check current level
-        current_level = device_data.get("current_level")
-        if current_level is not None:
-            return current_level > 0
-            
-        return False
-
-    @property
-    def brightness(self) -> int | None:
-        """Return the brightness of this light between 0..255."""
-        device_data = self._get_current_device_data()
-        if not device_data:
-            return None
-            
-        if self._attr_color_mode == ColorMode.BRIGHTNESS:
-            current_level = device_data.get("current_level")
-            if current_level is not None:
-                # Convert from 0-100 to 0-255
-                return int((current_level / 100) * 255)
-        return None
+            self._attr_is_on = bool(state)
+        else:
+            self._attr_is_on = current_level is not None and current_level > 0
+        
+        self._attr_brightness = None
+        if self._attr_color_mode == ColorMode.BRIGHTNESS and current_level is not None:
+            # Convert from 0-100 to 0-255, rounding to nearest
+            self._attr_brightness = (current_level * 255 + 50) // 100
 
     async def async_turn_on(self, **kwargs: Any) -> None:
         """Turn the light on."""
-        try:
-            brightness = kwargs.get("brightness")
-            if brightness is not None and self._attr_color_mode == ColorMode.BRIGHTNESS:
-                # Convert from 0-255 to 0-100 for position control
-                level = int((brightness / 255) * 100)
-                success = await self.coordinator.async_set_cover_position(self._device_id, level)
-            else:
-                success = await self.coordinator.async_turn_on_device(self._device_id)
-            
-            if success:
-                _LOGGER.info("Successfully turned on light %s", self._attr_name)
-            else:
-                _LOGGER.error("Failed to turn on light %s", self._attr_name)
-        except Exception as ex:
-            _LOGGER.error("Failed to turn on light %s: %s", self._attr_name, ex)
+        brightness = kwargs.get("brightness")
+        if brightness is not None and self._attr_color_mode == ColorMode.BRIGHTNESS:
+            # Convert from 0-255 to 0-100 for position control, rounding to nearest
+            level = (brightness * 100 + 127) // 255
+            success = await self.coordinator.async_set_cover_position(self._device_id, level)
+        else:
+            success = await self.coordinator.async_turn_on_device(self._device_id)
+        
+        if success:
+            _LOGGER.debug("Successfully turned on light %s", self._attr_name)
+        else:
+            _LOGGER.error("Failed to turn on light %s", self._attr_name)
 
     async def async_turn_off(self, **kwargs: Any) -> None:
         """Turn the light off."""
-        try:
-            success = await self.coordinator.async_turn_off_device(self._device_id)
-            if success:
-                _LOGGER.info("Successfully turned off light %s", self._attr_name)
-            else:
-                _LOGGER.error("Failed to turn off light %s", self._attr_name)
-        except Exception as ex:
-            _LOGGER.error("Failed to turn off light %s: %s", self._attr_name, ex) 
\ No newline at end of file
+        success = await self.coordinator.async_turn_off_device(self._device_id)
+        if success:
+            _LOGGER.debug("Successfully turned off light %s", self._attr_name)
+        else:
+            _LOGGER.error("Failed to turn off light %s", self._attr_name)
@@ -2,8 +2,7 @@
 from __future__ import annotations
 
 import logging
-from datetime import datetime, timezone
-from typing import Any
+from typing import Any, Callable, Iterable
 
 from homeassistant.components.sensor import (
     SensorDeviceClass,
@@ -14,11 +13,11 @@ from homeassistant.components.sensor import (
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.core import HomeAssistant
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
-from homeassistant.helpers.update_coordinator import CoordinatorEntity
 from homeassistant.const import PERCENTAGE, SIGNAL_STRENGTH_DECIBELS
 
-from .const import DOMAIN
+from .const import COVER_TYPES, DOMAIN
 from .coordinator import HomismartDataUpdateCoordinator
+from .entity import HomismartEntityBase, async_add_entities_batched, async_track_new_devices
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -65,6 +64,79 @@ SENSOR_TYPES: tuple[SensorEntityDescription, ...] = (
 )
 
 
+_SENSOR_DESCS_BY_KEY = {description.key: description for description in SENSOR_TYPES}
+
+# Last seen for all devices, position and curtain state for shutters/covers
+_DEFAULT_SENSOR_DESCS = (_SENSOR_DESCS_BY_KEY["last_seen"],)
+_COVER_SENSOR_DESCS = tuple(
+    _SENSOR_DESCS_BY_KEY[key] for key in ("position", "last_seen", "curtain_state")
+)
+_TYPE_SENSOR_DESCS = {device_type: _COVER_SENSOR_DESCS for device_type in COVER_TYPES}
+
+# Sensor description and the device data field that must be set for it to be created
+_OPTIONAL_SENSOR_FIELDS = (
+    (_SENSOR_DESCS_BY_KEY["battery"], "battery"),
+    (_SENSOR_DESCS_BY_KEY["signal_strength"], "rssi"),
+    (_SENSOR_DESCS_BY_KEY["status"], "onLine"),
+)
+
+
+def _position_value(device: dict[str, Any]) -> int | None:
+    """Convert HomISmart position (0=open, 100=closed) to HA position (0=closed, 100=open)."""
+    raw_position = device.get("current_level")
+    if raw_position is not None:
+        return 100 - raw_position
+    return None
+
+
+def _status_value(device: dict[str, Any]) -> str:
+    """Return the online status of a device."""
+    online = device.get("onLine")
+    if online is True:
+        return "Online"
+    elif online is False:
+        return "Offline"
+    return "Unknown"
+
+
+def _curtain_state_value(device: dict[str, Any]) -> Any:
+    """Return the curtain state, falling back to a position-based state."""
+    state = device.get("curtainState")
+    if state is not None:
+        return state
+    position = device.get("current_level", 0)
+    if position <= 5:
+        return "Open"
+    elif position >= 95:
+        return "Closed"
+    else:
+        return "Partially Open"
+
+
+def _no_value(device: dict[str, Any]) -> None:
+    """Return no value for unknown sensor keys."""
+    return None
+
+
+# Sensor key -> function computing the sensor state from device data
+_VALUE_FNS: dict[str, Callable[[dict[str, Any]], Any]] = {
+    "battery": lambda device: device.get("battery"),
+    "position": _position_value,
+    "signal_strength": lambda device: device.get("rssi"),
+    "status": _status_value,
+    # Set by the coordinator when the device is fetched or pushes an update
+    "last_seen": lambda device: device.get("last_seen"),
+    "curtain_state": _curtain_state_value,
+}
+
+
+# Sensor key -> extra state attribute and the device data field it mirrors
+_EXTRA_ATTR_FIELDS: dict[str, tuple[tuple[str, str], ...]] = {
+    "position": (("raw_position", "current_level"), ("target_position", "target_level")),
+    "status": (("online", "onLine"), ("last_communication", "lastCommunication")),
+}
+
+
 async def async_setup_entry(
     hass: HomeAssistant,
     config_entry: ConfigEntry,
@@ -73,66 +145,52 @@ async def async_setup_entry(
     """Set up HomISmart sensors from a config entry."""
     coordinator: HomismartDataUpdateCoordinator = hass.data[DOMAIN][config_entry.entry_id]
     
-    entities = []
+    def _get_devices() -> Iterable[dict[str, Any]]:
+        return coordinator.data.values() if coordinator.data else ()
     
-    if coordinator.data:
-        for device in coordinator.data:
-            device_type = device.get("type", "unknown")
-            _LOGGER.debug("🔍 Setting up sensors for device: %s (type: %s)", device.get("label", "Unknown"), device_type)
-            
-            # Add relevant sensors based on device type and available data
-            for description in SENSOR_TYPES:
-                if _should_create_sensor(device, description):
-                    entities.append(
-                        HomismartSensor(
-                            coordinator,
-                            device,
-                            description,
-                            config_entry.entry_id,
-                        )
-                    )
+    def _create_sensors(device: dict[str, Any]) -> list[HomismartSensor]:
+        if _LOGGER.isEnabledFor(logging.DEBUG):
+            _LOGGER.debug("🔍 Setting up sensors for device: %s (type: %s)", device.get("label", "Unknown"), device.get("type", "unknown"))
+        
+        # Add relevant sensors based on device type and available data
+        return [
+            HomismartSensor(coordinator, device, description, config_entry.entry_id)
+            for description in _sensor_descriptions_for(device)
+        ]
+    
+    entities = [sensor for device in _get_devices() for sensor in _create_sensors(device)]
+    
+    # Track before the first await so a refresh while adding can't hide a new device
+    async_track_new_devices(
+        coordinator, config_entry, async_add_entities, _get_devices, _create_sensors
+    )
     
     if entities:
-        async_add_entities(entities)
+        await async_add_entities_batched(async_add_entities, entities)
         _LOGGER.info("📊 Added %d HomISmart sensors", len(entities))
     else:
         _LOGGER.warning("⚠️ No sensor entities created")
 
 
-def _should_create_sensor(device: dict[str, Any], description: SensorEntityDescription) -> bool:
-    """Determine if a sensor should be created for a device."""
-    device_type = device.get("type", "")
-    
-    # Position sensor for covers/shutters
-    if description.key == "position" and device_type in ["shutter", "cover", "curtain"]:
-        return True
-    
-    # Battery sensor for battery-powered devices
-    if description.key == "battery" and device.get("battery") is not None:
-        return True
-    
-    # Signal strength for wireless devices
-    if description.key == "signal_strength" and device.get("rssi") is not None:
-        return True
-    
-    # Status sensor for all devices with online status
-    if description.key == "status" and device.get("onLine") is not None:
-        return True
-    
-    # Last seen for all devices
-    if description.key == "last_seen":
-        return True
-    
-    # Curtain state for shutters/covers
-    if description.key == "curtain_state" and device_type in ["shutter", "cover", "curtain"]:
-        return True
-    
-    return False
+def _sensor_descriptions_for(device: dict[str, Any]) -> list[SensorEntityDescription]:
+    """Return the descriptions of the sensors to create for a device."""
+    descriptions = list(_TYPE_SENSOR_DESCS.get(device.get("type", ""), _DEFAULT_SENSOR_DESCS))
+    descriptions.extend(
+        description
+        for description, field in _OPTIONAL_SENSOR_FIELDS
+        if device.get(field) is not None
+    )
+    return descriptions
 
 
-class HomismartSensor(CoordinatorEntity, SensorEntity):
+class HomismartSensor(HomismartEntityBase, SensorEntity):
     """Representation of a HomISmart sensor."""
 
+    __slots__ = ("_value_fn", "_extra_fields")
+
+    # The status sensor reports offline devices, so keep sensors available
+    _unavailable_when_offline = False
+
     def __init__(
         self,
         coordinator: HomismartDataUpdateCoordinator,
@@ -141,116 +199,34 @@ class HomismartSensor(CoordinatorEntity, SensorEntity):
         entry_id: str,
     ) -> None:
         """Initialize the sensor."""
-        super().__init__(coordinator)
+        super().__init__(coordinator, device, entry_id, "Unknown")
         self.entity_description = description
-        self._device = device
-        self._device_id = device.get("id")
-        self._entry_id = entry_id
-        
-        device_name = device.get("label", f"Device {self._device_id}")
-        self._attr_name = f"{device_name} {description.name}"
-        self._attr_unique_id = f"{entry_id}_{self._device_id}_{description.key}"
+        self._value_fn = _VALUE_FNS.get(description.key, _no_value)
+        self._extra_fields = _EXTRA_ATTR_FIELDS.get(description.key, ())
         
-        _LOGGER.debug("🔧 Created sensor: %s (ID: %s)", self._attr_name, self._attr_unique_id)
-
-    @property
-    def device_info(self) -> dict[str, Any]:
-        """Return device information about this entity."""
-        return {
-            "identifiers": {(DOMAIN, self._device_id)},
-            "name": self._device.get("label", f"Device {self._device_id}"),
-            "manufacturer": "HomISmart",
-            "model": self._device.get("type", "Unknown"),
-            "via_device": (DOMAIN, self._entry_id),
+        self._attr_name = f"{self._attr_name} {description.name}"
+        self._attr_unique_id = f"{self._attr_unique_id}_{description.key}"
+        self._attr_extra_state_attributes = {
+            "device_id": self._device_id,
+            "device_type": device.get("type"),
+            "device_label": device.get("label"),
         }
-
-    @property
-    def native_value(self) -> Any:
-        """Return the state of the sensor."""
-        if not self.coordinator.data:
-            return None
-            
-        # Find current device data
-        current_device = None
-        for device in self.coordinator.data:
-            if device.get("id") == self._device_id:
-                current_device = device
-                break
-        
-        if not current_device:
-            return None
         
-        key = self.entity_description.key
+        self._update_attrs()
         
-        if key == "battery":
-            return current_device.get("battery")
-        elif key == "position":
-            # Convert HomISmart position (0=open, 100=closed) to HA position (0=closed, 100=open)
-            raw_position = current_device.get("current_level")
-            if raw_position is not None:
-                return 100 - raw_position
-            return None
-        elif key == "signal_strength":
-            return current_device.get("rssi")
-        elif key == "status":
-            online = current_device.get("onLine")
-            if online is True:
-                return "Online"
-            elif online is False:
-                return "Offline"
-            return "Unknown"
-        elif key == "last_seen":
-            # Create a timestamp for last update with timezone
-            return datetime.now(timezone.utc)
-        elif key == "curtain_state":
-            state = current_device.get("curtainState")
-            if state is not None:
-                return state
-            # Fallback to position-based state
-            position = current_device.get("current_level", 0)
-            if position <= 5:
-                return "Open"
-            elif position >= 95:
-                return "Closed"
-            else:
-                return "Partially Open"
-        
-        return None
-
-    @property
-    def available(self) -> bool:
-        """Return if entity is available."""
-        return self.coordinator.last_update_success and self._device_id is not None
+        if _LOGGER.isEnabledFor(logging.DEBUG):
+            _LOGGER.debug("🔧 Created sensor: %s (ID: %s)", self._attr_name, self._attr_unique_id)
 
-    @property
-    def extra_state_attributes(self) -> dict[str, Any]:
-        """Return additional state attributes."""
-        if not self.coordinator.data:
-            return {}
-            
-        # Find current device data
-        current_device = None
-        for device in self.coordinator.data:
-            if device.get("id") == self._device_id:
-                current_device = device
-                break
-        
+    def _update_device_attrs(self, current_device: dict[str, Any] | None) -> None:
+        """Update the cached sensor value and attributes from device data."""
+        # Update the sensor-specific attributes in place
+        attributes = self._attr_extra_state_attributes
         if not current_device:
-            return {}
-        
-        attributes = {
-            "device_id": self._device_id,
-            "device_type": current_device.get("type"),
-            "device_label": current_device.get("label"),
-        }
-        
-        # Add sensor-specific attributes
-        key = self.entity_description.key
-        if key == "position":
-            attributes["raw_position"] = current_device.get("current_level")
-            attributes["target_position"] = current_device.get("target_level")
-        elif key == "status":
-            attributes["online"] = current_device.get("onLine")
-            attributes["last_communication"] = current_device.get("lastCommunication")
+            self._attr_native_value = None
+            for attr, _ in self._extra_fields:
+                attributes[attr] = None
+            return
         
-        return attributes 
\ No newline at end of file
+        self._attr_native_value = self._value_fn(current_device)
+        for attr, field in self._extra_fields:
+            attributes[attr] = current_device.get(field)
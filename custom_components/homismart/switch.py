@@ -8,13 +8,16 @@ from homeassistant.components.switch import SwitchEntity
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.core import HomeAssistant
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
-from homeassistant.helpers.update_coordinator import CoordinatorEntity
 
 from .const import DOMAIN
 from .coordinator import HomismartDataUpdateCoordinator
+from .entity import HomismartEntityBase, async_add_entities_batched, async_track_new_devices
 
 _LOGGER = logging.getLogger(__name__)
 
+# Raw device types exposed as switch entities
+SWITCH_DEVICE_TYPES = frozenset({"switch", "socket", "outlet"})
+
 
 async def async_setup_entry(
     hass: HomeAssistant,
@@ -24,21 +27,24 @@ async def async_setup_entry(
     """Set up the HomISmart switch platform."""
     coordinator: HomismartDataUpdateCoordinator = hass.data[DOMAIN][config_entry.entry_id]
 
-    entities = []
-    if coordinator.data:
-        for device_data in coordinator.data:
-            device_type = device_data.get("type", "")
-            if device_type in ["switch", "socket", "outlet"]:
-                device_id = device_data.get("id")
-                device_label = device_data.get("label", device_id)
-                _LOGGER.info("🔌 Adding switch entity: %s (ID: %s)", device_label, device_id)
-                entities.append(HomismartSwitch(coordinator, device_data, config_entry.entry_id))
+    entities = [
+        HomismartSwitch(coordinator, device_data, config_entry.entry_id)
+        for device_data in coordinator.devices_of_types(SWITCH_DEVICE_TYPES)
+    ]
 
     _LOGGER.info("✅ Added %d switch entities", len(entities))
-    async_add_entities(entities)
-
-
-class HomismartSwitch(CoordinatorEntity, SwitchEntity):
+    # Track before the first await so a refresh while adding can't hide a new device
+    async_track_new_devices(
+        coordinator,
+        config_entry,
+        async_add_entities,
+        lambda: coordinator.devices_of_types(SWITCH_DEVICE_TYPES),
+        lambda device_data: (HomismartSwitch(coordinator, device_data, config_entry.entry_id),),
+    )
+    await async_add_entities_batched(async_add_entities, entities)
+
+
+class HomismartSwitch(HomismartEntityBase, SwitchEntity):
     """Representation of a HomISmart switch."""
 
     def __init__(
@@ -48,82 +54,36 @@ class HomismartSwitch(CoordinatorEntity, SwitchEntity):
         entry_id: str,
     ) -> None:
         """Initialize the switch."""
-        super().__init__(coordinator)
-        self._device_data = device_data
-        self._device_id = device_data.get("id")
-        self._device = device_data.get("device")
-        self._entry_id = entry_id
-        
-        device_label = device_data.get("label", self._device_id)
-        self._attr_name = device_label
-        self._attr_unique_id = f"{entry_id}_{self._device_id}"
-
-    @property
-    def device_info(self) -> dict[str, Any]:
-        """Return device information."""
-        return {
-            "identifiers": {(DOMAIN, self._device_id)},
-            "name": self._device_data.get("label", self._device_id),
-            "manufacturer": "HomISmart",
-            "model": self._device_data.get("type", "Smart Switch"),
-            "via_device": (DOMAIN, self._entry_id),
-        }
-
-    def _get_current_device_data(self) -> dict[str, Any] | None:
-        """Get current device data from coordinator."""
-        if not self.coordinator.data:
-            return None
-        
-        for device_data in self.coordinator.data:
-            if device_data.get("id") == self._device_id:
-                return device_data
-        return None
-
-    @property
-    def available(self) -> bool:
-        """Return if entity is available."""
-        device_data = self._get_current_device_data()
-        if not device_data:
-            return False
-        return device_data.get("onLine", True) and self.coordinator.last_update_success
+        super().__init__(coordinator, device_data, entry_id, "Smart Switch")
 
-    @property
-    def is_on(self) -> bool:
-        """Return true if switch is on."""
-        device_data = self._get_current_device_data()
+        self._update_attrs()
+
+    def _update_device_attrs(self, device_data: dict[str, Any] | None) -> None:
+        """Update the cached switch state from device data."""
         if not device_data:
-            return False
-            
-        # Check various state attributes
+            self._attr_is_on = False
+            return
+        
+        # Check various state attributes, for switches with level control check current level
         state = device_data.get("state")
         if state is not None:
-            return bool(state)
-            
-        # For switches with level control, check current level
-        current_level = device_data.get("current_level")
-        if current_level is not None:
-            return current_level > 0
-            
-        return False
+            self._attr_is_on = bool(state)
+        else:
+            current_level = device_data.get("current_level")
+            self._attr_is_on = current_level is not None and current_level > 0
 
     async def async_turn_on(self, **kwargs: Any) -> None:
         """Turn the switch on."""
-        try:
-            success = await self.coordinator.async_turn_on_device(self._device_id)
-            if success:
-                _LOGGER.info("Successfully turned on switch %s", self._attr_name)
-            else:
-                _LOGGER.error("Failed to turn on switch %s", self._attr_name)
-        except Exception as ex:
-            _LOGGER.error("Failed to turn on switch %s: %s", self._attr_name, ex)
+        success = await self.coordinator.async_turn_on_device(self._device_id)
+        if success:
+            _LOGGER.debug("Successfully turned on switch %s", self._attr_name)
+        else:
+            _LOGGER.error("Failed to turn on switch %s", self._attr_name)
 
     async def async_turn_off(self, **kwargs: Any) -> None:
         """Turn the switch off."""
-        try:
-            success = await self.coordinator.async_turn_off_device(self._device_id)
-            if success:
-                _LOGGER.info("Successfully turned off switch %s", self._attr_name)
-            else:
-                _LOGGER.error("Failed to turn off switch %s", self._attr_name)
-        except Exception as ex:
-            _LOGGER.error("Failed to turn off switch %s: %s", self._attr_name, ex) 
\ No newline at end of file
+        success = await self.coordinator.async_turn_off_device(self._device_id)
+        if success:
+            _LOGGER.debug("Successfully turned off switch %s", self._attr_name)
+        else:
+            _LOGGER.error("Failed to turn off switch %s", self._attr_name)